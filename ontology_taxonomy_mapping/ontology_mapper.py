@@ -2,19 +2,38 @@
 RDF Ontology Mapping & Gap Analysis Tool
 Compares labels between fraud ontology (rdfs:label/skos:prefLabel) 
 and GAO Product Taxonomy (skos:prefLabel) with fuzzy matching
+(rapidfuzz Levenshtein-based ratio on normalized labels)
 """
 
 import rdflib
 from rdflib import Graph, Namespace, RDF, RDFS, OWL
 from rdflib.namespace import SKOS
 import pandas as pd
-from difflib import SequenceMatcher
-from collections import defaultdict
+import numpy as np
+from rapidfuzz import process, fuzz
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import os
 import re
+from sys import intern
 
 # Configuration
+# Similarity is rapidfuzz's fuzz.ratio: Levenshtein distance with insertions/deletions only (Indel),
+# normalized as 1 - distance / (len_a + len_b). Pairs below the threshold are cut off early.
 SIMILARITY_THRESHOLD = 0.75  # Adjust between 0.0-1.0 (higher = stricter)
 TOP_N_MATCHES = 5  # Number of candidate matches to report per concept
+CDIST_BLOCK_ROWS = 256  # Fraud labels scored per cdist call, so only one block of scores is held at a time
+
+MAPPING_FIELDS = ['fraud_uri', 'fraud_label', 'fraud_label_matched', 'gao_uri', 'gao_label',
+                  'similarity_score', 'fraud_parents']
+# Mapping rows are plain tuples (no per-row dict) so large result sets stay compact
+Mapping = namedtuple('Mapping', MAPPING_FIELDS)
+
+_URIRef = rdflib.term.URIRef
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
 
 def normalize_label(label):
     """Normalize labels for better matching"""
@@ -22,43 +41,57 @@ def normalize_label(label):
         return ""
     # Convert to lowercase, remove extra whitespace, strip punctuation
     normalized = str(label).lower().strip()
-    normalized = re.sub(r'[^\w\s]', '', normalized)
-    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = _PUNCT_RE.sub('', normalized)
+    normalized = _WS_RE.sub(' ', normalized)
     return normalized
 
-def calculate_similarity(str1, str2):
-    """Calculate similarity ratio between two strings"""
-    return SequenceMatcher(None, normalize_label(str1), normalize_label(str2)).ratio()
+def index_objects(graph, predicate):
+    """Map each subject to the list of its objects for one predicate (single index scan)"""
+    objects_by_subject = defaultdict(list)
+    for subj, obj in graph.subject_objects(predicate):
+        objects_by_subject[subj].append(obj)
+    return objects_by_subject
 
 def extract_fraud_concepts(graph, fraud_ns):
     """Extract concepts from fraud ontology with labels and hierarchy"""
     concepts = {}
+    fraud_ns_str = str(fraud_ns)
+    
+    # Materialize predicate views once instead of querying per subject
+    rdfs_labels = index_objects(graph, RDFS.label).get
+    pref_labels = index_objects(graph, SKOS.prefLabel).get
+    superclasses = index_objects(graph, RDFS.subClassOf).get
     
     # Query for all classes with labels
     for subj in graph.subjects(RDF.type, OWL.Class):
-        if str(subj).startswith(str(fraud_ns)):
-            labels = set()
-            parent_classes = []
-            
-            # Get rdfs:label
-            for label in graph.objects(subj, RDFS.label):
-                labels.add(str(label))
-            
-            # Get skos:prefLabel
-            for label in graph.objects(subj, SKOS.prefLabel):
-                labels.add(str(label))
-            
-            # Get parent classes
-            for parent in graph.objects(subj, RDFS.subClassOf):
-                if isinstance(parent, rdflib.term.URIRef):
-                    parent_classes.append(str(parent))
-            
-            if labels:
-                concepts[str(subj)] = {
-                    'labels': list(labels),
-                    'parents': parent_classes,
-                    'primary_label': list(labels)[0]  # Use first as primary
-                }
+        subj_str = intern(str(subj))
+        if not subj_str.startswith(fraud_ns_str):
+            continue
+        
+        # Keep labels in first-seen order so the primary label is stable across runs
+        labels_list = []
+        labels_seen = set()
+        parent_classes = []
+        
+        # Get rdfs:label, then skos:prefLabel
+        for label in (*rdfs_labels(subj, ()), *pref_labels(subj, ())):
+            label_str = str(label)
+            if label_str not in labels_seen:
+                labels_seen.add(label_str)
+                labels_list.append(label_str)
+        
+        # Get parent classes (named classes only, not restrictions/blank nodes)
+        for parent in superclasses(subj, ()):
+            if type(parent) is _URIRef:
+                parent_classes.append(intern(str(parent)))
+        
+        if labels_list:
+            concepts[subj_str] = {
+                'labels': labels_list,
+                'norm_labels': [normalize_label(label) for label in labels_list],
+                'parents': parent_classes,
+                'primary_label': labels_list[0]  # Use first as primary
+            }
     
     return concepts
 
@@ -66,22 +99,25 @@ def extract_gao_concepts(graph):
     """Extract concepts from GAO taxonomy with skos:prefLabel"""
     concepts = {}
     
+    # Materialize predicate views once instead of querying per subject
+    pref_labels = index_objects(graph, SKOS.prefLabel).get
+    related_by_subject = index_objects(graph, SKOS.related).get
+    broader_by_subject = index_objects(graph, SKOS.broader).get
+    narrower_by_subject = index_objects(graph, SKOS.narrower).get
+    
     # Query for all SKOS concepts
     for subj in graph.subjects(RDF.type, SKOS.Concept):
-        labels = []
-        
-        # Get skos:prefLabel
-        for label in graph.objects(subj, SKOS.prefLabel):
-            labels.append(str(label))
+        labels = [str(label) for label in pref_labels(subj, ())]
         
         # Get related concepts
-        related = [str(r) for r in graph.objects(subj, SKOS.related)]
-        broader = [str(b) for b in graph.objects(subj, SKOS.broader)]
-        narrower = [str(n) for n in graph.objects(subj, SKOS.narrower)]
+        related = [intern(str(r)) for r in related_by_subject(subj, ())]
+        broader = [intern(str(b)) for b in broader_by_subject(subj, ())]
+        narrower = [intern(str(n)) for n in narrower_by_subject(subj, ())]
         
         if labels:
-            concepts[str(subj)] = {
+            concepts[intern(str(subj))] = {
                 'labels': labels,
+                'norm_labels': [normalize_label(label) for label in labels],
                 'primary_label': labels[0],
                 'related': related,
                 'broader': broader,
@@ -91,134 +127,180 @@ def extract_gao_concepts(graph):
     return concepts
 
 def find_matches(fraud_concepts, gao_concepts, threshold=SIMILARITY_THRESHOLD, top_n=TOP_N_MATCHES):
-    """Find fuzzy matches between fraud and GAO concepts"""
-    mappings = []
+    """Find fuzzy matches between fraud and GAO concepts, yielding one mapping row at a time"""
+    
+    # Flatten GAO labels into parallel lists (label, owning concept)
+    gao_labels_flat = []
+    gao_owner_uris = []
+    gao_index = defaultdict(list)  # normalized label -> positions in the flat lists
+    for gao_uri, gao_data in gao_concepts.items():
+        for gao_label, gao_norm in zip(gao_data['labels'], gao_data['norm_labels']):
+            gao_index[gao_norm].append(len(gao_labels_flat))
+            gao_labels_flat.append(gao_label)
+            gao_owner_uris.append(gao_uri)
+    
+    # Deduplicate normalized labels so each distinct pair of strings is scored once
+    fraud_norms_unique = list(dict.fromkeys(
+        norm for data in fraud_concepts.values() for norm in data['norm_labels']
+    ))
+    fraud_rows = {norm: row for row, norm in enumerate(fraud_norms_unique)}
+    gao_norms_unique = list(gao_index)
+    gao_positions = [gao_index[norm] for norm in gao_norms_unique]
+    
+    if not fraud_norms_unique or not gao_norms_unique:
+        return
+    
+    # Similarity is normalized Indel similarity (0-100); pairs below the cutoff come back as 0
+    score_cutoff = threshold * 100
+    # Multi-threaded passes over all distinct pairs, one block of fraud labels at a time;
+    # only the hits of each row are kept
+    candidates = []
+    candidate_scores = []
+    for start in range(0, len(fraud_norms_unique), CDIST_BLOCK_ROWS):
+        scores = process.cdist(fraud_norms_unique[start:start + CDIST_BLOCK_ROWS], gao_norms_unique,
+                               scorer=fuzz.ratio, score_cutoff=score_cutoff, workers=-1)
+        for row in scores:
+            hits = np.flatnonzero(row >= score_cutoff)
+            candidates.append(hits)
+            candidate_scores.append(row[hits])
     
     for fraud_uri, fraud_data in fraud_concepts.items():
+        # Expand unique-label hits back to every GAO label sharing that normalized form
         matches = []
+        for label_idx, fraud_norm in enumerate(fraud_data['norm_labels']):
+            row = fraud_rows[fraud_norm]
+            for gao_row, similarity in zip(candidates[row], candidate_scores[row]):
+                for position in gao_positions[gao_row]:
+                    matches.append((float(similarity), label_idx, position))
         
-        # Compare each fraud label against all GAO labels
-        for fraud_label in fraud_data['labels']:
-            for gao_uri, gao_data in gao_concepts.items():
-                for gao_label in gao_data['labels']:
-                    similarity = calculate_similarity(fraud_label, gao_label)
-                    
-                    if similarity >= threshold:
-                        matches.append({
-                            'gao_uri': gao_uri,
-                            'gao_label': gao_label,
-                            'similarity': similarity,
-                            'fraud_label_used': fraud_label
-                        })
+        # Sort by similarity and keep top N (ties keep label order)
+        matches.sort(key=lambda match: (-match[0], match[1], match[2]))
         
-        # Sort by similarity and keep top N
-        matches.sort(key=lambda x: x['similarity'], reverse=True)
-        top_matches = matches[:top_n]
-        
-        if top_matches:
-            for match in top_matches:
-                mappings.append({
-                    'fraud_uri': fraud_uri,
-                    'fraud_label': fraud_data['primary_label'],
-                    'fraud_label_matched': match['fraud_label_used'],
-                    'gao_uri': match['gao_uri'],
-                    'gao_label': match['gao_label'],
-                    'similarity_score': round(match['similarity'], 3),
-                    'fraud_parents': '; '.join(fraud_data['parents'][:3])  # Limit for readability
-                })
-    
-    return mappings
-
-def identify_gaps(fraud_concepts, gao_concepts, mappings_df):
+        for similarity, label_idx, position in matches[:top_n]:
+            yield Mapping(
+                fraud_uri=fraud_uri,
+                fraud_label=fraud_data['primary_label'],
+                fraud_label_matched=fraud_data['labels'][label_idx],
+                gao_uri=gao_owner_uris[position],
+                gao_label=gao_labels_flat[position],
+                similarity_score=round(similarity / 100, 3),
+                fraud_parents='; '.join(fraud_data['parents'][:3])  # Limit for readability
+            )
+
+def fraud_concepts_frame(fraud_concepts):
+    """Tabulate fraud concepts once for vectorized gap analysis and export"""
+    return pd.DataFrame({
+        'uri': list(fraud_concepts),
+        'label': [data['primary_label'] for data in fraud_concepts.values()],
+        'all_labels': ['; '.join(data['labels']) for data in fraud_concepts.values()],
+        'parents': ['; '.join(data['parents'][:3]) for data in fraud_concepts.values()]
+    })
+
+def gao_concepts_frame(gao_concepts):
+    """Tabulate GAO concepts once for vectorized gap analysis and export"""
+    return pd.DataFrame({
+        'uri': list(gao_concepts),
+        'label': [data['primary_label'] for data in gao_concepts.values()],
+        'all_labels': ['; '.join(data['labels']) for data in gao_concepts.values()]
+    })
+
+def identify_gaps(fraud_df, gao_df, mapped_fraud, mapped_gao):
     """Identify concepts without mappings in both directions"""
     
     # Fraud concepts without GAO matches
-    mapped_fraud = set(mappings_df['fraud_uri'].unique()) if not mappings_df.empty else set()
-    unmapped_fraud = []
-    
-    for uri, data in fraud_concepts.items():
-        if uri not in mapped_fraud:
-            unmapped_fraud.append({
-                'uri': uri,
-                'label': data['primary_label'],
-                'all_labels': '; '.join(data['labels']),
-                'parents': '; '.join(data['parents'][:3])
-            })
+    unmapped_fraud = fraud_df[~fraud_df['uri'].isin(mapped_fraud)]
     
     # GAO concepts without fraud matches
-    mapped_gao = set(mappings_df['gao_uri'].unique()) if not mappings_df.empty else set()
-    unmapped_gao = []
-    
-    for uri, data in gao_concepts.items():
-        if uri not in mapped_gao:
-            unmapped_gao.append({
-                'uri': uri,
-                'label': data['primary_label'],
-                'all_labels': '; '.join(data['labels'])
-            })
+    unmapped_gao = gao_df[~gao_df['uri'].isin(mapped_gao)]
     
     return unmapped_fraud, unmapped_gao
 
-def main(fraud_file, gao_file, output_prefix='ontology_mapping'):
-    """Main execution function"""
+def detect_fraud_namespace(fraud_graph):
+    """Detect the fraud namespace (assuming consistent pattern)"""
+    for ns_prefix, ns_uri in fraud_graph.namespaces():
+        if 'gfo' in ns_prefix or 'fraud' in str(ns_uri).lower():
+            return Namespace(ns_uri)
     
-    print("Loading fraud ontology...")
+    # Fallback: find most common namespace for owl:Class subjects
+    ns_iter = (str(subj).rsplit('/', 1)[0] + '/' for subj in fraud_graph.subjects(RDF.type, OWL.Class))
+    return Namespace(Counter(ns_iter).most_common(1)[0][0])
+
+def load_fraud_concepts(fraud_file):
+    """Parse the fraud ontology and extract its concepts"""
     fraud_graph = Graph()
     fraud_graph.parse(fraud_file, format='turtle')
-    
-    print("Loading GAO taxonomy...")
+    fraud_ns = detect_fraud_namespace(fraud_graph)
+    return fraud_ns, extract_fraud_concepts(fraud_graph, fraud_ns)
+
+def load_gao_concepts(gao_file):
+    """Parse the GAO taxonomy and extract its concepts"""
     gao_graph = Graph()
     gao_graph.parse(gao_file, format='turtle')
+    return extract_gao_concepts(gao_graph)
+
+def main(fraud_file, gao_file, output_prefix='ontology_mapping'):
+    """Main execution function"""
     
-    # Detect fraud namespace (assuming consistent pattern)
-    fraud_ns = None
-    for ns_prefix, ns_uri in fraud_graph.namespaces():
-        if 'gfo' in ns_prefix or 'fraud' in str(ns_uri).lower():
-            fraud_ns = Namespace(ns_uri)
-            break
-    
-    if not fraud_ns:
-        # Fallback: find most common namespace for owl:Class subjects
-        ns_counts = defaultdict(int)
-        for subj in fraud_graph.subjects(RDF.type, OWL.Class):
-            ns = str(subj).rsplit('/', 1)[0] + '/'
-            ns_counts[ns] += 1
-        fraud_ns = Namespace(max(ns_counts, key=ns_counts.get))
+    # With a spare core, parse the small fraud ontology in a worker process while this process parses
+    # the much larger GAO taxonomy (rdflib parsing is CPU-bound Python, so threads would serialize on
+    # the GIL); only the fraud concepts are pickled back. On one core the two parses just compete
+    print("Loading fraud ontology and GAO taxonomy...")
+    if (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            fraud_future = executor.submit(load_fraud_concepts, fraud_file)
+            gao_concepts = load_gao_concepts(gao_file)
+            fraud_ns, fraud_concepts = fraud_future.result()
+    else:
+        fraud_ns, fraud_concepts = load_fraud_concepts(fraud_file)
+        gao_concepts = load_gao_concepts(gao_file)
     
     print(f"Fraud namespace detected: {fraud_ns}")
-    
-    print("\nExtracting fraud concepts...")
-    fraud_concepts = extract_fraud_concepts(fraud_graph, fraud_ns)
     print(f"Found {len(fraud_concepts)} fraud concepts")
-    
-    print("Extracting GAO concepts...")
-    gao_concepts = extract_gao_concepts(gao_graph)
     print(f"Found {len(gao_concepts)} GAO concepts")
     
+    fraud_df = fraud_concepts_frame(fraud_concepts)
+    gao_df = gao_concepts_frame(gao_concepts)
+    
     print(f"\nFinding matches (threshold={SIMILARITY_THRESHOLD})...")
-    mappings = find_matches(fraud_concepts, gao_concepts, SIMILARITY_THRESHOLD, TOP_N_MATCHES)
-    mappings_df = pd.DataFrame(mappings)
     
-    print(f"Found {len(mappings)} mappings")
+    # Stream mappings straight to disk; only the mapped URIs and scores stay in memory
+    mappings_file = f'{output_prefix}_mappings.csv'
+    mapped_fraud = set()
+    mapped_gao = set()
+    similarity_scores = np.empty(len(fraud_concepts) * TOP_N_MATCHES)
+    n_mappings = 0
+    
+    with open(mappings_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(MAPPING_FIELDS)
+        for mapping in find_matches(fraud_concepts, gao_concepts, SIMILARITY_THRESHOLD, TOP_N_MATCHES):
+            writer.writerow(mapping)
+            mapped_fraud.add(mapping.fraud_uri)
+            mapped_gao.add(mapping.gao_uri)
+            similarity_scores[n_mappings] = mapping.similarity_score
+            n_mappings += 1
+    similarity_scores = similarity_scores[:n_mappings]
+    
+    print(f"Found {n_mappings} mappings")
     
     print("\nIdentifying coverage gaps...")
-    unmapped_fraud, unmapped_gao = identify_gaps(fraud_concepts, gao_concepts, mappings_df)
+    unmapped_fraud, unmapped_gao = identify_gaps(fraud_df, gao_df, mapped_fraud, mapped_gao)
     
     # Save results
     print("\nSaving results...")
     
-    if not mappings_df.empty:
-        mappings_df.to_csv(f'{output_prefix}_mappings.csv', index=False)
-        print(f"✓ Mappings saved to {output_prefix}_mappings.csv")
+    if n_mappings:
+        print(f"✓ Mappings saved to {mappings_file}")
     else:
+        os.remove(mappings_file)
         print("⚠ No mappings found above threshold")
     
-    if unmapped_fraud:
-        pd.DataFrame(unmapped_fraud).to_csv(f'{output_prefix}_gaps_fraud.csv', index=False)
+    if not unmapped_fraud.empty:
+        unmapped_fraud.to_csv(f'{output_prefix}_gaps_fraud.csv', index=False)
         print(f"✓ Fraud gaps saved to {output_prefix}_gaps_fraud.csv ({len(unmapped_fraud)} concepts)")
     
-    if unmapped_gao:
-        pd.DataFrame(unmapped_gao).to_csv(f'{output_prefix}_gaps_gao.csv', index=False)
+    if not unmapped_gao.empty:
+        unmapped_gao.to_csv(f'{output_prefix}_gaps_gao.csv', index=False)
         print(f"✓ GAO gaps saved to {output_prefix}_gaps_gao.csv ({len(unmapped_gao)} concepts)")
     
     # Summary statistics
@@ -227,15 +309,15 @@ def main(fraud_file, gao_file, output_prefix='ontology_mapping'):
     print("="*60)
     print(f"Fraud concepts: {len(fraud_concepts)}")
     print(f"GAO concepts: {len(gao_concepts)}")
-    print(f"Mappings found: {len(mappings)}")
-    print(f"Fraud concepts mapped: {len(set(mappings_df['fraud_uri'])) if not mappings_df.empty else 0}")
-    print(f"GAO concepts mapped: {len(set(mappings_df['gao_uri'])) if not mappings_df.empty else 0}")
+    print(f"Mappings found: {n_mappings}")
+    print(f"Fraud concepts mapped: {len(mapped_fraud)}")
+    print(f"GAO concepts mapped: {len(mapped_gao)}")
     print(f"Unmapped fraud concepts: {len(unmapped_fraud)}")
     print(f"Unmapped GAO concepts: {len(unmapped_gao)}")
     
-    if not mappings_df.empty:
-        print(f"\nAverage similarity score: {mappings_df['similarity_score'].mean():.3f}")
-        print(f"Median similarity score: {mappings_df['similarity_score'].median():.3f}")
+    if n_mappings:
+        print(f"\nAverage similarity score: {similarity_scores.mean():.3f}")
+        print(f"Median similarity score: {np.median(similarity_scores):.3f}")
 
 if __name__ == "__main__":
     import sys
@@ -243,7 +325,7 @@ if __name__ == "__main__":
     if len(sys.argv) < 3:
         print("Usage: python ontology_mapper.py <fraud_ontology.ttl> <gao_taxonomy.ttl> [output_prefix]")
         print("\nConfiguration:")
-        print(f"  Similarity threshold: {SIMILARITY_THRESHOLD}")
+        print(f"  Similarity threshold: {SIMILARITY_THRESHOLD} (normalized Levenshtein/Indel ratio)")
         print(f"  Top matches per concept: {TOP_N_MATCHES}")
         print("\nTo adjust, edit SIMILARITY_THRESHOLD and TOP_N_MATCHES in the script")
         sys.exit(1)
@@ -1,8 +1,169 @@
 import streamlit as st
 import rdflib
+from rdflib import RDFS, OWL, SKOS, DCTERMS, Namespace
+from types import SimpleNamespace
+import pyoxigraph
 from pathlib import Path
 import pandas as pd
 import os
+import tempfile
+
+# SPARQL queries run on an in-process oxigraph store; the subclasses of the selected activity are filled into
+# each %(subclasses)s VALUES block per search
+GFO = Namespace("https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/")
+
+# Prefixes shared by every query, passed to the store instead of repeating PREFIX lines in each query
+PREFIXES = {"gfo": str(GFO), "rdfs": str(RDFS), "owl": str(OWL), "skos": str(SKOS), "dcterms": str(DCTERMS)}
+
+# Query for Federal Fraud Schemes
+FRAUD_SCHEME_QUERY = """
+SELECT DISTINCT ?individual ?individualName ?description ?fraudNarrative ?isDefinedBy
+WHERE {
+    ?individual a gfo:FederalFraudScheme ;
+                rdfs:label ?individualName .
+   
+    OPTIONAL { ?individual dcterms:description ?description . }
+    OPTIONAL { ?individual gfo:fraudNarrative ?fraudNarrative . }
+    OPTIONAL { ?individual rdfs:isDefinedBy ?isDefinedBy . }
+   
+    # Match each individual once (restrictions are blank nodes, so they cannot be bound up front);
+    # joining the raw UNION rows against the OPTIONALs above was the bulk of the query time
+    {
+        SELECT DISTINCT ?individual
+        WHERE {
+            {
+                ?individual a ?someClass .
+                ?someClass owl:onProperty gfo:involves ;
+                           owl:someValuesFrom ?specificFraud .
+       
+                ?specificFraud rdfs:subClassOf ?fraudType .
+                ?fraudType rdfs:label ?fraudTypeName .
+       
+                VALUES ?specificFraud { %(subclasses)s }
+            }
+            UNION
+            {
+                ?individual a ?fraudSchemeClass .
+                VALUES ?fraudSchemeClass { %(subclasses)s }
+                ?fraudSchemeClass rdfs:subClassOf ?fraudType .
+                ?fraudType rdfs:label ?fraudTypeName .
+       
+                FILTER(?fraudSchemeClass != gfo:FederalFraudScheme)
+            }
+    
+            FILTER(?fraudType != gfo:FraudActivity)
+        }
+    }
+}
+ORDER BY ?individualName
+"""
+
+# Query for the four resource types that link to fraud activities through gfo:addresses
+# (FraudEducation, prevention & detection guidance, risk management principles, GAO reports);
+# ?topClass tells the rows apart so the handler can split them into sections
+RESOURCE_QUERY = """
+SELECT DISTINCT ?topClass ?individual ?individualName ?definition ?website ?isDefinedBy
+WHERE {
+    VALUES ?topClass {
+        gfo:FraudEducation
+        gfo:FraudPreventionAndDetectionGuidance
+        gfo:FraudRiskManagementPrinciples
+        gfo:GAOReport
+    }
+    
+    ?individual a ?topClass ;
+                rdfs:label ?individualName .
+    
+    OPTIONAL { ?individual skos:definition ?definition . }
+    OPTIONAL { ?individual gfo:hasWebsite ?website . }
+    OPTIONAL { ?individual rdfs:isDefinedBy ?isDefinedBy . }
+    
+    {
+        ?individual a ?someClass .
+        ?someClass owl:onProperty gfo:addresses ;
+                   owl:someValuesFrom ?specificFraud .
+        
+        VALUES ?specificFraud { %(subclasses)s }
+    }
+    UNION
+    {
+        ?individual a ?resourceClass .
+        VALUES ?resourceClass { %(subclasses)s }
+    }
+    
+    # Checked in the outer group: ?topClass is not bound inside a UNION branch
+    FILTER(!BOUND(?resourceClass) || ?resourceClass != ?topClass)
+}
+ORDER BY ?individualName
+"""
+
+# Result section for each ?topClass of RESOURCE_QUERY
+RESOURCE_SECTIONS = {
+    str(GFO.FraudEducation): "awareness_resources",
+    str(GFO.FraudPreventionAndDetectionGuidance): "prevention_resources",
+    str(GFO.FraudRiskManagementPrinciples): "risk_mgmt_resources",
+    str(GFO.GAOReport): "gao_reports",
+}
+
+# Fraud activity choices shown in the search box, mapped to their GFO class local names
+FRAUD_ACTIVITY_MAPPING = {
+    "Beneficiary fraud": "BeneficiaryFraud",
+    "Cellphone fraud": "CellphoneFraud",
+    "Charity fraud": "CharityFraud",
+    "Confidence fraud": "ConfidenceFraud",
+    "Consumer fraud": "ConsumerFraud",
+    "Corporate fraud": "CorporateFraud",
+    "Corruption": "Corruption",
+    "Cyber espionage": "CyberEspionage",
+    "Cyberextortion": "Cyberextortion",
+    "Environmental fraud": "EnvironmentalFraud",
+    "Federal contract fraud": "ContractFraud",
+    "Financial institution fraud": "FinancialInstitutionFraud",
+    "Government furnished equipment fraud": "GovernmentFurnishedEquipmentFraud",
+    "Grant fraud": "GrantFraud",
+    "Healthcare fraud": "HealthcareFraud",
+    "Housing fraud": "HousingFraud",
+    "Identity fraud": "IdentityFraud",
+    "Insurance fraud": "InsuranceFraud",
+    "Investment fraud": "InvestmentFraud",
+    "Laboratory fraud": "LaboratoryFraud",
+    "Lien filing fraud": "LienFillingFraud",
+    "Loan fraud": "LoanFraud",
+    "Mail fraud": "MailFraud",
+    "Media manipulation": "MediaManipulation",
+    "Payment fraud": "PaymentFraud",
+    "Procurement fraud": "ProcurementFraud",
+    "Public assistance fraud": "AssistanceFraud",
+    "Public emergency fraud": "public_emergency_fraud",
+    "Sanction evasion fraud": "SanctionEvasion",
+    "Student financial aid fraud": "StudentFinancialAidFraud",
+    "Supervised release": "supervised_release",
+    "Tax fraud": "TaxFraud",
+    "Trafficking": "Trafficking",
+    "Visa fraud": "VisaFraud",
+    "Wire fraud": "WireFraud",
+    "Workplace fraud": "WorkplaceFraud"
+}
+FRAUD_ACTIVITY_LABELS = tuple(FRAUD_ACTIVITY_MAPPING)
+
+# Query for the subclasses of every fraud activity (the materialized closure includes each class itself)
+SUBCLASS_QUERY = f"""
+SELECT ?activity ?subclass
+WHERE {{
+    VALUES ?activity {{ {" ".join(f"<{GFO[activity]}>" for activity in FRAUD_ACTIVITY_MAPPING.values())} }}
+    ?subclass rdfs:subClassOf ?activity .
+}}
+"""
+
+# Part of the N-Triples cache file name; bump it whenever materialize_subclass_closure or the cache
+# layout changes, so caches written by older code (still newer than their source) are not reused
+NT_CACHE_VERSION = 2
+
+# First line of the N-Triples cache, followed by the source triple count (an N-Triples comment)
+NT_COUNT_HEADER = b"# source triples: "
+
+# Sections with more rows than this are shown as one table instead of an expander per row
+EXPANDER_ROW_LIMIT = 20
 
 # Set page config
 st.set_page_config(
@@ -28,10 +189,118 @@ if 'ontology' not in st.session_state:
     st.session_state.ontology = None
 if 'loaded_file' not in st.session_state:
     st.session_state.loaded_file = None
+if 'ontology_key' not in st.session_state:
+    st.session_state.ontology_key = None
+if 'subclasses' not in st.session_state:
+    st.session_state.subclasses = {}
+
+def materialize_subclass_closure(g):
+    # Assert every (class, rdfs:subClassOf, ancestor) pair, including class-to-itself, so queries
+    # can use a plain rdfs:subClassOf triple pattern instead of evaluating subClassOf* paths.
+    # Only fraud activities and their named subclasses are ever bound on the subject side
+    activities = [GFO[activity] for activity in FRAUD_ACTIVITY_MAPPING.values()]
+    nodes = {cls for activity in activities if (activity, None, None) in g or (None, None, activity) in g
+             for cls in g.transitive_subjects(RDFS.subClassOf, activity) if isinstance(cls, rdflib.URIRef)}
+    for cls in nodes:
+        for ancestor in list(g.transitive_objects(cls, RDFS.subClassOf)):
+            g.add((cls, RDFS.subClassOf, ancestor))
+
+def activity_subclasses(store):
+    # Map each fraud activity's local name to the IRIs of its subclasses; blank nodes are left out
+    # because they cannot appear in a VALUES block
+    subclasses = {}
+    for solution in store.query(SUBCLASS_QUERY, prefixes=PREFIXES):
+        if isinstance(solution["subclass"], pyoxigraph.NamedNode):
+            activity = solution["activity"].value[len(GFO):]
+            subclasses.setdefault(activity, []).append(solution["subclass"].value)
+    return {activity: tuple(sorted(iris)) for activity, iris in subclasses.items()}
+
+def warn_missing_activities():
+    # Flag search options whose class the loaded ontology does not define (e.g. a misspelled local name)
+    missing = [f"{label} (gfo:{activity})" for label, activity in FRAUD_ACTIVITY_MAPPING.items()
+               if activity not in st.session_state.subclasses]
+    if missing:
+        st.sidebar.warning("Not defined in this ontology: " + ", ".join(missing))
+
+def run_query(store, query, subclasses):
+    # Fill the activity's subclasses into the query's VALUES blocks (no subClassOf joins left for oxigraph
+    # to plan) and return rows with plain string values (None when unbound)
+    solutions = store.query(query % {"subclasses": " ".join(f"<{iri}>" for iri in subclasses)}, prefixes=PREFIXES)
+    names = [var.value for var in solutions.variables]
+    return [SimpleNamespace(**{name: term.value if (term := solution[name]) is not None else None for name in names})
+            for solution in solutions]
+
+def scheme_frame(rows):
+    # Table view of fraud scheme rows for sections too long to list as expanders
+    return pd.DataFrame({
+        "Name": [row.individualName for row in rows],
+        "Description": [row.description or "" for row in rows],
+        "Fraud Narrative": [row.fraudNarrative or "" for row in rows],
+        "Source": [row.isDefinedBy or "" for row in rows],
+    })
+
+def resource_frame(rows):
+    # Table view of resource rows for sections too long to list as expanders
+    return pd.DataFrame({
+        "Name": [row.individualName for row in rows],
+        "Definition": [row.definition or "" for row in rows],
+        "Website": [row.website or "" for row in rows],
+        "Source": [row.isDefinedBy or "" for row in rows],
+    })
+
+@st.cache_data(max_entries=64)
+def run_all_queries(_store, ontology_key, subclasses):
+    # Cached per (ontology file + mtime, activity subclasses); the store itself is left out of the cache key
+    results = {"fraud_schemes": run_query(_store, FRAUD_SCHEME_QUERY, subclasses)}
+    results.update({section: [] for section in RESOURCE_SECTIONS.values()})
+    for row in run_query(_store, RESOURCE_QUERY, subclasses):
+        results[RESOURCE_SECTIONS[row.topClass]].append(row)
+    return results
+
+def closed_ntriples(g):
+    # Parse with rdflib for its format support, then hand the closed triples to oxigraph for querying;
+    # the triple count reported to users is taken before the closure adds its triples
+    triple_count = len(g)
+    materialize_subclass_closure(g)
+    return triple_count, g.serialize(format="nt", encoding="utf-8")
+
+def write_ntriples_cache(nt_path, triple_count, ntriples):
+    # Write to a temp file in the same directory and rename it into place, so readers never see
+    # a partial cache; a failed write (e.g. read-only checkout, full disk) just leaves no cache
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=nt_path.parent, prefix=nt_path.name, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(NT_COUNT_HEADER + b"%d\n" % triple_count)
+            f.write(ntriples)
+        # mkstemp creates the file owner-only; make the cache readable like any other checkout file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, nt_path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
 
 @st.cache_resource
-def load_ontology_rdflib(file_path):
+def load_ontology(file_path):
     try:
+        # The closed graph is cached as N-Triples beside the source file; oxigraph loads that directly,
+        # skipping the rdflib parse and closure whenever the cache is newer than the source
+        nt_path = Path(file_path).with_suffix(f".closure-v{NT_CACHE_VERSION}.nt")
+        if nt_path.exists() and nt_path.stat().st_mtime >= os.path.getmtime(file_path):
+            try:
+                with open(nt_path, "rb") as f:
+                    triple_count = int(f.readline().removeprefix(NT_COUNT_HEADER))
+                store = pyoxigraph.Store()
+                store.bulk_load(path=str(nt_path), format=pyoxigraph.RdfFormat.N_TRIPLES)
+                return store, triple_count
+            except (OSError, SyntaxError, ValueError):
+                # Unreadable or corrupt cache: drop it and rebuild from the source below
+                try:
+                    nt_path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+        
         g = rdflib.Graph()
         if file_path.endswith('.ttl'):
             g.parse(file_path, format="turtle")
@@ -41,10 +310,29 @@ def load_ontology_rdflib(file_path):
             g.parse(file_path, format="json-ld")
         else:
             g.parse(file_path)
-        return g
+        triple_count, ntriples = closed_ntriples(g)
+        write_ntriples_cache(nt_path, triple_count, ntriples)
+        store = pyoxigraph.Store()
+        store.bulk_load(ntriples, format=pyoxigraph.RdfFormat.N_TRIPLES)
+        return store, triple_count
+    except Exception as e:
+        st.error(f"Error loading ontology: {str(e)}")
+        return None, 0
+
+@st.cache_resource(max_entries=4, ttl=3600)
+def load_uploaded_ontology(data, file_name):
+    # Uploads are parsed straight from memory; the format is guessed from the file name. Only a few
+    # recent uploads keep their store cached, so each new file does not pin another store for good
+    try:
+        g = rdflib.Graph()
+        g.parse(data=data, format=rdflib.util.guess_format(file_name))
+        triple_count, ntriples = closed_ntriples(g)
+        store = pyoxigraph.Store()
+        store.bulk_load(ntriples, format=pyoxigraph.RdfFormat.N_TRIPLES)
+        return store, triple_count
     except Exception as e:
         st.error(f"Error loading ontology: {str(e)}")
-        return None
+        return None, 0
 
 def load_default_ontology():
     script_dir = Path(__file__).parent
@@ -53,14 +341,15 @@ def load_default_ontology():
     if default_ontology_path.exists():
         try:
             with st.spinner("Loading GFO ontology..."):
-                st.session_state.ontology = load_ontology_rdflib(str(default_ontology_path))
+                st.session_state.ontology, triple_count = load_ontology(str(default_ontology_path))
                 st.session_state.loaded_file = "gfo_turtle.ttl (default)"
-                st.session_state.uploaded_file_path = str(default_ontology_path)
+                st.session_state.ontology_key = f"{default_ontology_path}:{os.path.getmtime(default_ontology_path)}"
+                st.session_state.subclasses = activity_subclasses(st.session_state.ontology) if st.session_state.ontology else {}
                 
                 if st.session_state.ontology:
-                    triple_count = len(st.session_state.ontology)
                     st.sidebar.success(f"[OK] Auto-loaded: gfo_turtle.ttl")
                     st.sidebar.info(f"Triples: {triple_count}")
+                    warn_missing_activities()
                     return True
         except Exception as e:
             st.sidebar.error(f"Failed to load: {str(e)}")
@@ -74,18 +363,15 @@ if st.session_state.ontology is None:
 
 # Handle file upload
 if uploaded_file is not None and uploaded_file != st.session_state.loaded_file:
-    temp_path = f"/tmp/{uploaded_file.name}"
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    
-    st.session_state.ontology = load_ontology_rdflib(temp_path)
+    st.session_state.ontology, triple_count = load_uploaded_ontology(uploaded_file.getvalue(), uploaded_file.name)
     st.session_state.loaded_file = uploaded_file
-    st.session_state.uploaded_file_path = temp_path
+    st.session_state.ontology_key = f"{uploaded_file.name}:{uploaded_file.file_id}"
+    st.session_state.subclasses = activity_subclasses(st.session_state.ontology) if st.session_state.ontology else {}
     
     if st.session_state.ontology:
-        triple_count = len(st.session_state.ontology)
         st.sidebar.success(f"[OK] Loaded: {uploaded_file.name}")
         st.sidebar.info(f"Triples: {triple_count}")
+        warn_missing_activities()
 
 # Main interface
 if st.session_state.ontology:
@@ -93,244 +379,33 @@ if st.session_state.ontology:
     st.header("Fraud Activity Search")
     st.markdown("Search for all resources related to specific fraud activities.")
     
-    fraud_activity_mapping = {
-        "Beneficiary fraud": "BeneficiaryFraud",
-        "Cellphone fraud": "CellphoneFraud",
-        "Charity fraud": "CharityFraud",
-        "Confidence fraud": "ConfidenceFraud",
-        "Consumer fraud": "ConsumerFraud",
-        "Corporate fraud": "CorporateFraud",
-        "Corruption": "Corruption",
-        "Cyber espionage": "CyberEspionage",
-        "Cyberextortion": "Cyberextortion",
-        "Environmental fraud": "EnvironmentalFraud",
-        "Federal contract fraud": "ContractFraud",
-        "Financial institution fraud": "FinancialInstitutionFraud",
-        "Government furnished equipment fraud": "GovernmentFurnishedEquipmentFraud",
-        "Grant fraud": "GrantFraud",
-        "Healthcare fraud": "HealthcareFraud",
-        "Housing fraud": "HousingFraud",
-        "Identity fraud": "IdentityFraud",
-        "Insurance fraud": "InsuranceFraud",
-        "Investment fraud": "InvestmentFraud",
-        "Laboratory fraud": "LaboratoryFraud",
-        "Lien filing fraud": "LienFillingFraud",
-        "Loan fraud": "LoanFraud",
-        "Mail fraud": "MailFraud",
-        "Media manipulation": "MediaManipulation",
-        "Payment fraud": "PaymentFraud",
-        "Procurement fraud": "ProcurementFraud",
-        "Public assistance fraud": "AssistanceFraud",
-        "Public emergency fraud": "public_emergency_fraud",
-        "Sanction evasion fraud": "SanctionEvasion",
-        "Student financial aid fraud": "StudentFinancialAidFraud",
-        "Supervised release": "supervised_release",
-        "Tax fraud": "TaxFraud",
-        "Trafficking": "Trafficking",
-        "Visa fraud": "VisaFraud",
-        "Wire fraud": "WireFraud",
-        "Workplace fraud": "WorkplaceFraud"
-    }
-    
     fraud_activity_label = st.selectbox(
         "Select Fraud Activity Type:",
-        options=list(fraud_activity_mapping.keys()),
+        options=FRAUD_ACTIVITY_LABELS,
         help="Choose a fraud activity type to find all related resources"
     )
     
-    fraud_activity = fraud_activity_mapping.get(fraud_activity_label)
+    fraud_activity = FRAUD_ACTIVITY_MAPPING[fraud_activity_label]
     
     if st.button("Search All Resources"):
-        if fraud_activity_label and fraud_activity:
-            
-            # Query for Federal Fraud Schemes
-            fraud_scheme_query = f"""
-PREFIX gfo: <https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX owl: <http://www.w3.org/2002/07/owl#>
-PREFIX dcterms: <http://purl.org/dc/terms/>
- 
-SELECT DISTINCT ?individual ?individualName ?description ?fraudNarrative ?isDefinedBy
-WHERE {{
-    ?individual a gfo:FederalFraudScheme ;
-                rdfs:label ?individualName .
-   
-    OPTIONAL {{ ?individual dcterms:description ?description . }}
-    OPTIONAL {{ ?individual gfo:fraudNarrative ?fraudNarrative . }}
-    OPTIONAL {{ ?individual rdfs:isDefinedBy ?isDefinedBy . }}
-   
-    {{
-        ?individual a ?someClass .
-        ?someClass owl:onProperty gfo:involves ;
-                   owl:someValuesFrom ?specificFraud .
-       
-        ?specificFraud rdfs:subClassOf* ?fraudType .
-        ?fraudType rdfs:label ?fraudTypeName .
-       
-        ?specificFraud rdfs:subClassOf* gfo:{fraud_activity} .
-    }}
-    UNION
-    {{
-        ?individual a ?fraudSchemeClass .
-        ?fraudSchemeClass rdfs:subClassOf* gfo:{fraud_activity} .
-        ?fraudSchemeClass rdfs:subClassOf* ?fraudType .
-        ?fraudType rdfs:label ?fraudTypeName .
-       
-        FILTER(?fraudSchemeClass != gfo:FederalFraudScheme)
-    }}
-    
-    FILTER(?fraudType != gfo:FraudActivity)
-}}
-ORDER BY ?individualName
-"""
-
-            # Query for Fraud Awareness Resources (FraudEducation)
-            awareness_query = f"""
-PREFIX gfo: <https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX owl: <http://www.w3.org/2002/07/owl#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT DISTINCT ?individual ?individualName ?definition ?website ?isDefinedBy
-WHERE {{
-    ?individual a gfo:FraudEducation ;
-                rdfs:label ?individualName .
-    
-    OPTIONAL {{ ?individual skos:definition ?definition . }}
-    OPTIONAL {{ ?individual gfo:hasWebsite ?website . }}
-    OPTIONAL {{ ?individual rdfs:isDefinedBy ?isDefinedBy . }}
-    
-    {{
-        ?individual a ?someClass .
-        ?someClass owl:onProperty gfo:addresses ;
-                   owl:someValuesFrom ?specificFraud .
-        
-        ?specificFraud rdfs:subClassOf* gfo:{fraud_activity} .
-    }}
-    UNION
-    {{
-        ?individual a ?resourceClass .
-        ?resourceClass rdfs:subClassOf* gfo:{fraud_activity} .
-        
-        FILTER(?resourceClass != gfo:FraudEducation)
-    }}
-}}
-ORDER BY ?individualName
-"""
-
-            # Query for Fraud Prevention & Detection Guidance
-            prevention_query = f"""
-PREFIX gfo: <https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX owl: <http://www.w3.org/2002/07/owl#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT DISTINCT ?individual ?individualName ?definition ?website ?isDefinedBy
-WHERE {{
-    ?individual a gfo:FraudPreventionAndDetectionGuidance ;
-                rdfs:label ?individualName .
-    
-    OPTIONAL {{ ?individual skos:definition ?definition . }}
-    OPTIONAL {{ ?individual gfo:hasWebsite ?website . }}
-    OPTIONAL {{ ?individual rdfs:isDefinedBy ?isDefinedBy . }}
-    
-    {{
-        ?individual a ?someClass .
-        ?someClass owl:onProperty gfo:addresses ;
-                   owl:someValuesFrom ?specificFraud .
-        
-        ?specificFraud rdfs:subClassOf* gfo:{fraud_activity} .
-    }}
-    UNION
-    {{
-        ?individual a ?resourceClass .
-        ?resourceClass rdfs:subClassOf* gfo:{fraud_activity} .
-        
-        FILTER(?resourceClass != gfo:FraudPreventionAndDetectionGuidance)
-    }}
-}}
-ORDER BY ?individualName
-"""
-
-            # Query for Fraud Risk Management Principles
-            risk_mgmt_query = f"""
-PREFIX gfo: <https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX owl: <http://www.w3.org/2002/07/owl#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT DISTINCT ?individual ?individualName ?definition ?website ?isDefinedBy
-WHERE {{
-    ?individual a gfo:FraudRiskManagementPrinciples ;
-                rdfs:label ?individualName .
-    
-    OPTIONAL {{ ?individual skos:definition ?definition . }}
-    OPTIONAL {{ ?individual gfo:hasWebsite ?website . }}
-    OPTIONAL {{ ?individual rdfs:isDefinedBy ?isDefinedBy . }}
-    
-    {{
-        ?individual a ?someClass .
-        ?someClass owl:onProperty gfo:addresses ;
-                   owl:someValuesFrom ?specificFraud .
-        
-        ?specificFraud rdfs:subClassOf* gfo:{fraud_activity} .
-    }}
-    UNION
-    {{
-        ?individual a ?resourceClass .
-        ?resourceClass rdfs:subClassOf* gfo:{fraud_activity} .
-        
-        FILTER(?resourceClass != gfo:FraudRiskManagementPrinciples)
-    }}
-}}
-ORDER BY ?individualName
-"""
-
-            # Query for GAO Reports
-            gao_report_query = f"""
-PREFIX gfo: <https://gaoinnovations.gov/antifraud_resource/howfraudworks/gfo/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX owl: <http://www.w3.org/2002/07/owl#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT DISTINCT ?individual ?individualName ?definition ?website ?isDefinedBy
-WHERE {{
-    ?individual a gfo:GAOReport ;
-                rdfs:label ?individualName .
-    
-    OPTIONAL {{ ?individual skos:definition ?definition . }}
-    OPTIONAL {{ ?individual gfo:hasWebsite ?website . }}
-    OPTIONAL {{ ?individual rdfs:isDefinedBy ?isDefinedBy . }}
-    
-    {{
-        ?individual a ?someClass .
-        ?someClass owl:onProperty gfo:addresses ;
-                   owl:someValuesFrom ?specificFraud .
-        
-        ?specificFraud rdfs:subClassOf* gfo:{fraud_activity} .
-    }}
-    UNION
-    {{
-        ?individual a ?resourceClass .
-        ?resourceClass rdfs:subClassOf* gfo:{fraud_activity} .
-        
-        FILTER(?resourceClass != gfo:GAOReport)
-    }}
-}}
-ORDER BY ?individualName
-"""
+        if fraud_activity not in st.session_state.subclasses:
+            # No queries to run for an activity the loaded ontology does not define
+            st.info(f"{fraud_activity_label} (gfo:{fraud_activity}) is not defined in the loaded ontology")
+        elif fraud_activity_label and fraud_activity:
             
             try:
-                g = rdflib.Graph()
-                if 'uploaded_file_path' in st.session_state:
-                    g.parse(st.session_state.uploaded_file_path)
+                # Query the store already loaded (and closed) at load time
+                store = st.session_state.ontology
+                if store is not None:
                     
                     # Execute all queries
-                    fraud_schemes = list(g.query(fraud_scheme_query))
-                    awareness_resources = list(g.query(awareness_query))
-                    prevention_resources = list(g.query(prevention_query))
-                    risk_mgmt_resources = list(g.query(risk_mgmt_query))
-                    gao_reports = list(g.query(gao_report_query))
+                    subclasses = st.session_state.subclasses[fraud_activity]
+                    results = run_all_queries(store, st.session_state.ontology_key, subclasses)
+                    fraud_schemes = results["fraud_schemes"]
+                    awareness_resources = results["awareness_resources"]
+                    prevention_resources = results["prevention_resources"]
+                    risk_mgmt_resources = results["risk_mgmt_resources"]
+                    gao_reports = results["gao_reports"]
                     
                     # Calculate total results
                     total_results = (len(fraud_schemes) + len(awareness_resources) + 
@@ -345,19 +420,22 @@ ORDER BY ?individualName
                             st.markdown("---")
                             st.subheader(f"GAO Reports ({len(gao_reports)})")
                             
-                            for i, row in enumerate(gao_reports):
-                                resource_name = str(row.individualName)
-                                definition = str(row.definition) if row.definition else "No definition available"
-                                website = str(row.website) if row.website else ""
-                                is_defined_by_url = str(row.isDefinedBy) if row.isDefinedBy else "No definition source available"
+                            if len(gao_reports) > EXPANDER_ROW_LIMIT:
+                                st.dataframe(resource_frame(gao_reports), width="stretch", hide_index=True)
+                            else:
+                                for i, row in enumerate(gao_reports):
+                                    resource_name = row.individualName
+                                    definition = row.definition or "No definition available"
+                                    website = row.website or ""
+                                    is_defined_by_url = row.isDefinedBy or "No definition source available"
                                 
-                                with st.expander(f"{i+1}. {resource_name}"):
-                                    st.write(f"**Definition:** {definition}")
-                                    if website:
-                                        st.write(f"**Website:** {website}")
-                                    st.write(f"**Related to:** {fraud_activity_label}")
-                                    st.markdown("---")
-                                    st.caption(f"Source: {is_defined_by_url}")
+                                    with st.expander(f"{i+1}. {resource_name}"):
+                                        st.write(f"**Definition:** {definition}")
+                                        if website:
+                                            st.write(f"**Website:** {website}")
+                                        st.write(f"**Related to:** {fraud_activity_label}")
+                                        st.markdown("---")
+                                        st.caption(f"Source: {is_defined_by_url}")
                         
                         st.markdown("---")
                         
@@ -369,19 +447,22 @@ ORDER BY ?individualName
                             if fraud_schemes:
                                 st.subheader(f"Fraud Scheme Examples ({len(fraud_schemes)})")
                                 
-                                for i, row in enumerate(fraud_schemes):
-                                    scheme_name = str(row.individualName)
-                                    fraud_description = str(row.description) if row.description else "No description available"
-                                    fraud_narrative_uri = str(row.fraudNarrative) if row.fraudNarrative else "No fraud narrative available"
-                                    is_defined_by_url = str(row.isDefinedBy) if row.isDefinedBy else "No definition source available"
+                                if len(fraud_schemes) > EXPANDER_ROW_LIMIT:
+                                    st.dataframe(scheme_frame(fraud_schemes), width="stretch", hide_index=True)
+                                else:
+                                    for i, row in enumerate(fraud_schemes):
+                                        scheme_name = row.individualName
+                                        fraud_description = row.description or "No description available"
+                                        fraud_narrative_uri = row.fraudNarrative or "No fraud narrative available"
+                                        is_defined_by_url = row.isDefinedBy or "No definition source available"
                                     
-                                    with st.expander(f"{i+1}. {scheme_name}"):
-                                        st.write(f"**Fraud Description:** {fraud_description}")
-                                        st.write("**Fraud Narrative:**")
-                                        st.text(fraud_narrative_uri)
-                                        st.write(f"**Related to:** {fraud_activity_label}")
-                                        st.markdown("---")
-                                        st.caption(f"Source: {is_defined_by_url}")
+                                        with st.expander(f"{i+1}. {scheme_name}"):
+                                            st.write(f"**Fraud Description:** {fraud_description}")
+                                            st.write("**Fraud Narrative:**")
+                                            st.text(fraud_narrative_uri)
+                                            st.write(f"**Related to:** {fraud_activity_label}")
+                                            st.markdown("---")
+                                            st.caption(f"Source: {is_defined_by_url}")
                             else:
                                 st.subheader("Fraud Scheme Examples (0)")
                                 st.info("No fraud scheme examples found")
@@ -391,19 +472,22 @@ ORDER BY ?individualName
                             if prevention_resources:
                                 st.subheader(f"Fraud Prevention & Detection Guidance ({len(prevention_resources)})")
                                 
-                                for i, row in enumerate(prevention_resources):
-                                    resource_name = str(row.individualName)
-                                    definition = str(row.definition) if row.definition else "No definition available"
-                                    website = str(row.website) if row.website else ""
-                                    is_defined_by_url = str(row.isDefinedBy) if row.isDefinedBy else "No definition source available"
+                                if len(prevention_resources) > EXPANDER_ROW_LIMIT:
+                                    st.dataframe(resource_frame(prevention_resources), width="stretch", hide_index=True)
+                                else:
+                                    for i, row in enumerate(prevention_resources):
+                                        resource_name = row.individualName
+                                        definition = row.definition or "No definition available"
+                                        website = row.website or ""
+                                        is_defined_by_url = row.isDefinedBy or "No definition source available"
                                     
-                                    with st.expander(f"{i+1}. {resource_name}"):
-                                        st.write(f"**Definition:** {definition}")
-                                        if website:
-                                            st.write(f"**Website:** {website}")
-                                        st.write(f"**Related to:** {fraud_activity_label}")
-                                        st.markdown("---")
-                                        st.caption(f"Source: {is_defined_by_url}")
+                                        with st.expander(f"{i+1}. {resource_name}"):
+                                            st.write(f"**Definition:** {definition}")
+                                            if website:
+                                                st.write(f"**Website:** {website}")
+                                            st.write(f"**Related to:** {fraud_activity_label}")
+                                            st.markdown("---")
+                                            st.caption(f"Source: {is_defined_by_url}")
                             else:
                                 st.subheader("Fraud Prevention & Detection Guidance (0)")
                                 st.info("No prevention & detection guidance found")
@@ -416,19 +500,22 @@ ORDER BY ?individualName
                             if awareness_resources:
                                 st.subheader(f"Fraud Awareness Resources ({len(awareness_resources)})")
                                 
-                                for i, row in enumerate(awareness_resources):
-                                    resource_name = str(row.individualName)
-                                    definition = str(row.definition) if row.definition else "No definition available"
-                                    website = str(row.website) if row.website else ""
-                                    is_defined_by_url = str(row.isDefinedBy) if row.isDefinedBy else "No definition source available"
+                                if len(awareness_resources) > EXPANDER_ROW_LIMIT:
+                                    st.dataframe(resource_frame(awareness_resources), width="stretch", hide_index=True)
+                                else:
+                                    for i, row in enumerate(awareness_resources):
+                                        resource_name = row.individualName
+                                        definition = row.definition or "No definition available"
+                                        website = row.website or ""
+                                        is_defined_by_url = row.isDefinedBy or "No definition source available"
                                     
-                                    with st.expander(f"{i+1}. {resource_name}"):
-                                        st.write(f"**Definition:** {definition}")
-                                        if website:
-                                            st.write(f"**Website:** {website}")
-                                        st.write(f"**Related to:** {fraud_activity_label}")
-                                        st.markdown("---")
-                                        st.caption(f"Source: {is_defined_by_url}")
+                                        with st.expander(f"{i+1}. {resource_name}"):
+                                            st.write(f"**Definition:** {definition}")
+                                            if website:
+                                                st.write(f"**Website:** {website}")
+                                            st.write(f"**Related to:** {fraud_activity_label}")
+                                            st.markdown("---")
+                                            st.caption(f"Source: {is_defined_by_url}")
                             else:
                                 st.subheader("Fraud Awareness Resources (0)")
                                 st.info("No fraud awareness resources found")
@@ -438,19 +525,22 @@ ORDER BY ?individualName
                             if risk_mgmt_resources:
                                 st.subheader(f"Fraud Risk Management Principles ({len(risk_mgmt_resources)})")
                                 
-                                for i, row in enumerate(risk_mgmt_resources):
-                                    resource_name = str(row.individualName)
-                                    definition = str(row.definition) if row.definition else "No definition available"
-                                    website = str(row.website) if row.website else ""
-                                    is_defined_by_url = str(row.isDefinedBy) if row.isDefinedBy else "No definition source available"
+                                if len(risk_mgmt_resources) > EXPANDER_ROW_LIMIT:
+                                    st.dataframe(resource_frame(risk_mgmt_resources), width="stretch", hide_index=True)
+                                else:
+                                    for i, row in enumerate(risk_mgmt_resources):
+                                        resource_name = row.individualName
+                                        definition = row.definition or "No definition available"
+                                        website = row.website or ""
+                                        is_defined_by_url = row.isDefinedBy or "No definition source available"
                                     
-                                    with st.expander(f"{i+1}. {resource_name}"):
-                                        st.write(f"**Definition:** {definition}")
-                                        if website:
-                                            st.write(f"**Website:** {website}")
-                                        st.write(f"**Related to:** {fraud_activity_label}")
-                                        st.markdown("---")
-                                        st.caption(f"Source: {is_defined_by_url}")
+                                        with st.expander(f"{i+1}. {resource_name}"):
+                                            st.write(f"**Definition:** {definition}")
+                                            if website:
+                                                st.write(f"**Website:** {website}")
+                                            st.write(f"**Related to:** {fraud_activity_label}")
+                                            st.markdown("---")
+                                            st.caption(f"Source: {is_defined_by_url}")
                             else:
                                 st.subheader("Fraud Risk Management Principles (0)")
                                 st.info("No fraud risk management principles found")